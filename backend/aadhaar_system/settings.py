@@ -12,6 +12,10 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import atexit
+import shutil
+import tempfile
 from dotenv import load_dotenv
 import dj_database_url
 
@@ -203,6 +207,11 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Test runs upload files; keep them in a throwaway directory, not the repo
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    MEDIA_ROOT = Path(tempfile.mkdtemp(prefix="aadhaar_test_media_"))
+    atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
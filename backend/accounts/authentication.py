@@ -73,7 +73,7 @@ class JWTAuthentication(authentication.BaseAuthentication):
             user_data = self._verify_supabase_jwt_locally(token)
             
             if user_data:
-                logger.info(f"Supabase user verified locally: {user_data.get('email')}")
+                logger.info("Supabase user verified locally: %s", user_data.get('email'))
                 # Get or create local user from decoded token data
                 user = self._get_or_create_user_from_token_data(user_data)
             else:
@@ -88,10 +88,10 @@ class JWTAuthentication(authentication.BaseAuthentication):
                     return None
                 
                 supabase_user = response.user
-                logger.info(f"Supabase user found via API: {supabase_user.email}")
+                logger.info("Supabase user found via API: %s", supabase_user.email)
                 user = self._get_or_create_user_from_supabase(supabase_user)
             
-            logger.info(f"Local user: {user.username} (id={user.id})")
+            logger.info("Local user: %s (id=%s)", user.username, user.id)
             
             if not user.is_active:
                 raise exceptions.AuthenticationFailed('User is inactive')
@@ -101,7 +101,7 @@ class JWTAuthentication(authentication.BaseAuthentication):
         except exceptions.AuthenticationFailed:
             raise
         except Exception as e:
-            logger.error(f"Supabase token auth failed: {type(e).__name__}: {e}")
+            logger.error("Supabase token auth failed: %s: %s", type(e).__name__, e)
             import traceback
             logger.error(traceback.format_exc())
             return None
@@ -134,7 +134,7 @@ class JWTAuthentication(authentication.BaseAuthentication):
                 audience='authenticated',  # Supabase default audience for authenticated users
             )
             
-            logger.debug(f"JWT verified locally for user: {payload.get('email')}")
+            logger.debug("JWT verified locally for user: %s", payload.get('email'))
             
             # Extract user data from verified Supabase JWT payload
             return {
@@ -163,16 +163,16 @@ class JWTAuthentication(authentication.BaseAuthentication):
                     'role': payload.get('role'),
                 }
             except Exception as e:
-                logger.warning(f"JWT verification failed after audience retry: {e}")
+                logger.warning("JWT verification failed after audience retry: %s", e)
                 return None
         except jwt.InvalidSignatureError:
             logger.warning("Invalid JWT signature - possible token forgery attempt")
             return None
         except jwt.DecodeError as e:
-            logger.warning(f"JWT decode error: {e}")
+            logger.warning("JWT decode error: %s", e)
             return None
         except Exception as e:
-            logger.warning(f"Local JWT verification failed: {e}")
+            logger.warning("Local JWT verification failed: %s", e)
             return None
     
     def _get_or_create_user_from_token_data(self, user_data):
@@ -346,7 +346,7 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
         except exceptions.AuthenticationFailed:
             raise
         except Exception as e:
-            logger.error(f"Supabase authentication error: {e}")
+            logger.error("Supabase authentication error: %s", e)
             raise exceptions.AuthenticationFailed('Authentication failed')
     
     def _get_or_create_user(self, supabase_user):
@@ -34,7 +34,7 @@ def get_supabase_clients():
         from aadhaar_system.supabase_client import SupabaseAuth, get_supabase, get_supabase_admin
         return SupabaseAuth, get_supabase, get_supabase_admin
     except ImportError as e:
-        logger.error(f"Failed to import Supabase client: {e}")
+        logger.error("Failed to import Supabase client: %s", e)
         return None, None, None
 
 
@@ -115,7 +115,7 @@ def supabase_register(request):
             }, status=status.HTTP_400_BAD_REQUEST)
             
     except Exception as e:
-        logger.error(f"Supabase registration error: {e}")
+        logger.error("Supabase registration error: %s", e)
         return Response({
             'success': False,
             'message': str(e)
@@ -221,7 +221,7 @@ def sync_user(request):
         })
         
     except Exception as e:
-        logger.error(f"User sync error: {e}")
+        logger.error("User sync error: %s", e)
         return Response({
             'success': False,
             'message': str(e)
@@ -317,7 +317,7 @@ def supabase_login(request):
             }, status=status.HTTP_401_UNAUTHORIZED)
             
     except Exception as e:
-        logger.error(f"Supabase login error: {e}")
+        logger.error("Supabase login error: %s", e)
         return Response({
             'success': False,
             'message': 'Invalid email or password'
@@ -367,7 +367,7 @@ def supabase_refresh_token(request):
             }, status=status.HTTP_401_UNAUTHORIZED)
             
     except Exception as e:
-        logger.error(f"Supabase token refresh error: {e}")
+        logger.error("Supabase token refresh error: %s", e)
         return Response({
             'success': False,
             'message': 'Invalid refresh token'
@@ -385,7 +385,7 @@ def supabase_logout(request):
         try:
             SupabaseAuth.sign_out()
         except Exception as e:
-            logger.warning(f"Supabase logout warning: {e}")
+            logger.warning("Supabase logout warning: %s", e)
     
     return Response({
         'success': True,
@@ -6,10 +6,14 @@ to detect document tampering, photo overlays, tampered QR codes, and altered fon
 """
 
 import os
+import gc  # For memory cleanup
+import hashlib
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 import numpy as np
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +37,41 @@ def convert_to_json_serializable(obj: Any) -> Any:
     else:
         return obj
 
+def _split_into_blocks(arr: np.ndarray, block_size: int) -> np.ndarray:
+    """
+    View a 2D array as a grid of non-overlapping square blocks.
+    
+    Covers the same blocks as stepping ``range(0, rows - block_size, block_size)``
+    over both axes, and returns a (n_rows, n_cols, block_size, block_size) view
+    so per-block statistics can be reduced in a single NumPy call.
+    """
+    rows, cols = arr.shape[:2]
+    n_rows = max(0, -(-(rows - block_size) // block_size))
+    n_cols = max(0, -(-(cols - block_size) // block_size))
+    cropped = arr[:n_rows * block_size, :n_cols * block_size]
+    return cropped.reshape(n_rows, block_size, n_cols, block_size).swapaxes(1, 2)
+
+# Keywords marking indicators produced by the CV heuristics (often false positives)
+CV_INDICATOR_KEYWORDS = ('compression', 'noise', 'copy-paste', 'edge')
+
+
+def split_cv_indicators(indicators: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Partition fraud indicators into critical and CV-heuristic ones in one pass.
+    
+    Returns:
+        Tuple of (critical_indicators, cv_indicators)
+    """
+    critical_indicators = []
+    cv_indicators = []
+    for ind in indicators:
+        lowered = ind.lower()
+        if any(kw in lowered for kw in CV_INDICATOR_KEYWORDS):
+            cv_indicators.append(ind)
+        else:
+            critical_indicators.append(ind)
+    return critical_indicators, cv_indicators
+
 # Try to import ultralytics, but make it optional
 try:
     from ultralytics import YOLO
@@ -81,6 +120,10 @@ class FraudDetector:
         'digital_manipulation': 'Signs of digital manipulation detected'
     }
     
+    # Cache detection results by image content hash so re-submitted images skip re-analysis
+    CACHE_PREFIX = "fraud_detection"
+    CACHE_TIMEOUT = 60 * 60  # 1 hour
+    
     def __init__(self, model_path: Optional[str] = None, confidence_threshold: float = 0.25):
         """
         Initialize the fraud detector.
@@ -98,6 +141,12 @@ class FraudDetector:
         self.confidence_threshold = confidence_threshold
         self.is_loaded = False
         self._model_searched = False  # Track if we've searched for model
+        self._load_lock = threading.Lock()  # Load the model once across threads
+        
+        # Reusable OpenCV objects for copy-paste detection (created once, not per image)
+        if CV2_AVAILABLE:
+            self._orb = cv2.ORB_create(nfeatures=500)
+            self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
         
         # DON'T load model at init - use lazy loading to save memory
     
@@ -112,7 +161,7 @@ class FraudDetector:
         for path in default_paths:
             if path.exists():
                 self.model_path = str(path)
-                logger.info(f"Found fraud detection model at: {self.model_path}")
+                logger.info("Found fraud detection model at: %s", self.model_path)
                 return
         
         logger.warning("No fraud detection model found. Detection will be limited.")
@@ -124,24 +173,27 @@ class FraudDetector:
             return
         
         if not self.model_path or not os.path.exists(self.model_path):
-            logger.error(f"Model file not found: {self.model_path}")
+            logger.error("Model file not found: %s", self.model_path)
             return
         
         try:
             self.model = YOLO(self.model_path)
             self.is_loaded = True
-            logger.info(f"Fraud detection model loaded successfully")
+            logger.info("Fraud detection model loaded successfully")
         except Exception as e:
-            logger.error(f"Failed to load fraud detection model: {e}")
+            logger.error("Failed to load fraud detection model: %s", e)
             self.model = None
             self.is_loaded = False
     
-    def detect(self, image_path: str) -> Dict:
+    def detect(self, image_path: str, use_cache: bool = True) -> Dict:
         """
         Detect fraud indicators in an Aadhaar document image.
         
         Args:
             image_path: Path to the image file
+            use_cache: Return a cached result for identical image bytes if present.
+                Pass False for explicit re-analysis; the fresh result still
+                replaces the cached one.
             
         Returns:
             Dictionary containing:
@@ -150,8 +202,6 @@ class FraudDetector:
             - risk_score: Overall risk score (0-1)
             - risk_level: 'low', 'medium', or 'high'
         """
-        import gc  # For memory cleanup
-        
         result = {
             'detections': [],
             'fraud_indicators': [],
@@ -161,31 +211,53 @@ class FraudDetector:
         }
         
         if not os.path.exists(image_path):
-            logger.error(f"Image not found: {image_path}")
+            logger.error("Image not found: %s", image_path)
             result['fraud_indicators'].append("Image file not found")
             result['risk_score'] = 1.0
             result['risk_level'] = 'high'
             return result
         
         # LAZY LOADING: Load model on first use (saves ~200MB until needed)
+        # Double-checked under a lock so concurrent first requests load it once
         if not self._model_searched:
-            self._model_searched = True
-            if self.model_path is None:
-                self._find_default_model()
-            if self.model_path and YOLO_AVAILABLE and not self.is_loaded:
-                self._load_model()
+            with self._load_lock:
+                if not self._model_searched:
+                    if self.model_path is None:
+                        self._find_default_model()
+                    if self.model_path and YOLO_AVAILABLE and not self.is_loaded:
+                        self._load_model()
+                    self._model_searched = True
+        
+        # Read the file once: the bytes are hashed for the result cache and
+        # decoded into the array shared between YOLO and CV analysis
+        buffer = self._read_image_bytes(image_path)
+        cache_key = (
+            f"{self.CACHE_PREFIX}:{hashlib.sha256(buffer).hexdigest()}" if buffer is not None else None
+        )
+        cached = cache.get(cache_key) if use_cache and cache_key else None
+        if cached is not None:
+            logger.info("Returning cached fraud detection result for %s", image_path)
+            return cached
+        
+        image = self._decode_image(buffer, image_path) if CV2_AVAILABLE and buffer is not None else None
+        
+        # Track failures so a degraded result is never cached
+        analysis_failed = False
         
         # Run YOLO detection if model is available
         if self.is_loaded and self.model:
-            yolo_results = self._run_yolo_detection(image_path)
+            yolo_source = image if image is not None else image_path
+            yolo_results = self._run_yolo_detection(yolo_source)
             result['detections'] = yolo_results['detections']
             result['fraud_indicators'].extend(yolo_results['fraud_indicators'])
+            analysis_failed = analysis_failed or yolo_results.get('error', False)
         
         # Run additional CV-based analysis
         if CV2_AVAILABLE:
-            cv_results = self._run_cv_analysis(image_path)
+            cv_results = self._run_cv_analysis(image)
             result['fraud_indicators'].extend(cv_results['fraud_indicators'])
             result['analysis_details'] = cv_results['details']
+            analysis_failed = analysis_failed or cv_results.get('error', False)
         
         # Calculate overall risk score
         result['risk_score'] = self._calculate_risk_score(result)
@@ -195,28 +267,51 @@ class FraudDetector:
         gc.collect()
         
         # Convert all numpy types to JSON-serializable Python types
-        return convert_to_json_serializable(result)
+        result = convert_to_json_serializable(result)
+        if cache_key and not analysis_failed:
+            cache.set(cache_key, result, self.CACHE_TIMEOUT)
+        return result
     
-    def _run_yolo_detection(self, image_path: str) -> Dict:
-        """Run YOLO model inference."""
+    def _read_image_bytes(self, image_path: str) -> Optional[np.ndarray]:
+        """Read the raw file bytes into a uint8 NumPy buffer."""
+        try:
+            return np.fromfile(image_path, dtype=np.uint8)
+        except Exception as e:
+            logger.error("Failed to read image %s: %s", image_path, e)
+            return None
+    
+    def _decode_image(self, buffer: np.ndarray, image_path: str) -> Optional[np.ndarray]:
+        """Decode raw file bytes into a BGR array."""
+        try:
+            return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        except Exception as e:
+            logger.error("Failed to decode image %s: %s", image_path, e)
+            return None
+    
+    def _run_yolo_detection(self, source) -> Dict:
+        """Run YOLO model inference on an image path or decoded BGR array."""
         detections = []
         fraud_indicators = []
+        error = False
         
         try:
             results = self.model.predict(
-                image_path,
+                source,
                 conf=self.confidence_threshold,
                 verbose=False
             )
             
             if results and len(results) > 0:
-                for box in results[0].boxes:
-                    cls_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    bbox = box.xyxy[0].tolist()
-                    
+                # Convert the box tensors to Python lists once rather than per box
+                boxes = results[0].boxes
+                names = results[0].names
+                cls_ids = [int(c) for c in boxes.cls.tolist()]
+                confs = boxes.conf.tolist()
+                bboxes = boxes.xyxy.tolist()
+                
+                for cls_id, conf, bbox in zip(cls_ids, confs, bboxes):
                     # Get class name from model, fallback to DEFAULT_CLASS_NAMES
-                    cls_name = results[0].names.get(cls_id)
+                    cls_name = names.get(cls_id)
                     if not cls_name or cls_name.startswith('class_'):
                         cls_name = self.DEFAULT_CLASS_NAMES.get(cls_id, f'detection_{cls_id}')
                     
@@ -235,28 +330,29 @@ class FraudDetector:
                         )
         
         except Exception as e:
-            logger.error(f"YOLO detection failed: {e}")
+            logger.error("YOLO detection failed: %s", e)
+            error = True
         
         return {
             'detections': detections,
-            'fraud_indicators': fraud_indicators
+            'fraud_indicators': fraud_indicators,
+            'error': error
         }
     
-    def _run_cv_analysis(self, image_path: str) -> Dict:
-        """Run computer vision analysis for fraud detection."""
+    def _run_cv_analysis(self, img: Optional[np.ndarray]) -> Dict:
+        """Run computer vision analysis for fraud detection on a decoded BGR image."""
         fraud_indicators = []
         details = {}
+        error = False
         
         try:
-            # Read image
-            img = cv2.imread(image_path)
             if img is None:
-                return {'fraud_indicators': ['Could not read image'], 'details': {}}
+                return {'fraud_indicators': ['Could not read image'], 'details': {}, 'error': True}
             
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             
             # 1. Check for image manipulation using ELA-like analysis
-            compression_artifacts = self._check_compression_artifacts(img)
+            compression_artifacts = self._check_compression_artifacts(gray)
             details['compression_analysis'] = compression_artifacts
             if compression_artifacts['suspicious']:
                 fraud_indicators.append(
@@ -292,32 +388,29 @@ class FraudDetector:
                 )
             
         except Exception as e:
-            logger.error(f"CV analysis failed: {e}")
+            logger.error("CV analysis failed: %s", e)
             fraud_indicators.append(f"Analysis error: {str(e)}")
+            error = True
         
         return {
             'fraud_indicators': fraud_indicators,
-            'details': details
+            'details': details,
+            'error': error
         }
     
-    def _check_compression_artifacts(self, img: np.ndarray) -> Dict:
+    def _check_compression_artifacts(self, gray: np.ndarray) -> Dict:
         """Check for suspicious JPEG compression artifacts."""
         try:
-            # Convert to YCrCb and analyze
-            ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
-            y_channel = ycrcb[:, :, 0]
+            # The Y (luma) channel of YCrCb uses the same weights as BGR2GRAY,
+            # so reuse the grayscale image instead of a full colour conversion
+            y_channel = gray
             
-            # Compute DCT-like features
-            rows, cols = y_channel.shape
+            # Compute DCT-like features (per-block variance in one vectorized pass)
             block_size = 8
-            variances = []
+            blocks = _split_into_blocks(y_channel, block_size).astype(float)
+            variances = blocks.var(axis=(2, 3)).ravel()
             
-            for i in range(0, rows - block_size, block_size):
-                for j in range(0, cols - block_size, block_size):
-                    block = y_channel[i:i+block_size, j:j+block_size].astype(float)
-                    variances.append(np.var(block))
-            
-            if variances:
+            if variances.size:
                 variance_of_variances = np.var(variances)
                 mean_variance = np.mean(variances)
                 score = variance_of_variances / (mean_variance + 1e-10)
@@ -341,24 +434,25 @@ class FraudDetector:
         """Detect potential copy-paste manipulation."""
         try:
             # Use ORB features to find similar regions
-            orb = cv2.ORB_create(nfeatures=500)
-            keypoints, descriptors = orb.detectAndCompute(gray, None)
+            keypoints, descriptors = self._orb.detectAndCompute(gray, None)
             
             if descriptors is not None and len(descriptors) > 10:
                 # Use BFMatcher to find similar features
-                bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
-                matches = bf.knnMatch(descriptors, descriptors, k=2)
+                matches = self._matcher.knnMatch(descriptors, descriptors, k=2)
                 
                 # Filter suspicious matches (similar features in different locations)
-                suspicious_matches = 0
-                for m, n in matches:
-                    if m.queryIdx != m.trainIdx:  # Not the same point
-                        if m.distance < 30:  # Very similar
-                            pt1 = keypoints[m.queryIdx].pt
-                            pt2 = keypoints[m.trainIdx].pt
-                            dist = np.sqrt((pt1[0]-pt2[0])**2 + (pt1[1]-pt2[1])**2)
-                            if dist > 50:  # Minimum distance apart
-                                suspicious_matches += 1
+                # using array masks instead of per-match Python arithmetic
+                best = [m for m, n in matches]
+                query_idx = np.array([m.queryIdx for m in best], dtype=np.intp)
+                train_idx = np.array([m.trainIdx for m in best], dtype=np.intp)
+                distances = np.array([m.distance for m in best], dtype=np.float32)
+                points = np.array([kp.pt for kp in keypoints], dtype=np.float64)
+                
+                # Not the same point, and very similar descriptors
+                candidate = (query_idx != train_idx) & (distances < 30)
+                offsets = points[query_idx[candidate]] - points[train_idx[candidate]]
+                # Minimum distance apart
+                suspicious_matches = int(np.count_nonzero(np.hypot(offsets[:, 0], offsets[:, 1]) > 50))
                 
                 suspicious = suspicious_matches > 10
                 return {
@@ -380,9 +474,10 @@ class FraudDetector:
             
             for i in range(0, rows - block_size, block_size):
                 for j in range(0, cols - block_size, block_size):
-                    block = gray[i:i+block_size, j:j+block_size].astype(float)
+                    # Slice is a uint8 view; no float/uint8 round-trip copies needed
+                    block = gray[i:i+block_size, j:j+block_size]
                     # Estimate noise using Laplacian
-                    laplacian = cv2.Laplacian(block.astype(np.uint8), cv2.CV_64F)
+                    laplacian = cv2.Laplacian(block, cv2.CV_64F)
                     noise = np.var(laplacian)
                     local_noises.append(noise)
             
@@ -412,20 +507,14 @@ class FraudDetector:
             edges = cv2.Canny(gray, 50, 150)
             
             # Analyze edge density in different regions
-            rows, cols = edges.shape
             block_size = 64
-            edge_densities = []
+            blocks = _split_into_blocks(edges, block_size)
+            edge_densities = (blocks > 0).mean(axis=(2, 3)).ravel()
             
-            for i in range(0, rows - block_size, block_size):
-                for j in range(0, cols - block_size, block_size):
-                    block = edges[i:i+block_size, j:j+block_size]
-                    density = np.sum(block > 0) / (block_size * block_size)
-                    edge_densities.append(density)
-            
-            if edge_densities:
+            if edge_densities.size:
                 variance = np.var(edge_densities)
-                max_density = max(edge_densities)
-                min_density = min(edge_densities)
+                max_density = edge_densities.max()
+                min_density = edge_densities.min()
                 
                 # Very high contrast in edge density may indicate cut/paste
                 suspicious = (max_density - min_density) > 0.5 and variance > 0.02
@@ -497,15 +586,7 @@ class FraudDetector:
         
         # CV-based fraud indicators have lower weight (often false positives)
         # Only count indicators that are NOT from CV analysis
-        cv_indicator_keywords = ['compression', 'noise', 'copy-paste', 'edge']
-        critical_indicators = [
-            ind for ind in result['fraud_indicators']
-            if not any(kw in ind.lower() for kw in cv_indicator_keywords)
-        ]
-        cv_indicators = [
-            ind for ind in result['fraud_indicators']
-            if any(kw in ind.lower() for kw in cv_indicator_keywords)
-        ]
+        critical_indicators, cv_indicators = split_cv_indicators(result['fraud_indicators'])
         
         # Critical indicators (from YOLO/actual fraud detection) have higher weight
         if critical_indicators:
@@ -538,24 +619,28 @@ class FraudDetector:
 
 # Singleton instance for easy access
 _fraud_detector_instance = None
+_fraud_detector_lock = threading.Lock()
 
 def get_fraud_detector() -> FraudDetector:
-    """Get or create the fraud detector instance."""
+    """Get or create the fraud detector instance (thread-safe)."""
     global _fraud_detector_instance
     if _fraud_detector_instance is None:
-        _fraud_detector_instance = FraudDetector()
+        with _fraud_detector_lock:
+            if _fraud_detector_instance is None:
+                _fraud_detector_instance = FraudDetector()
     return _fraud_detector_instance
 
 
-def detect_fraud(image_path: str) -> Dict:
+def detect_fraud(image_path: str, use_cache: bool = True) -> Dict:
     """
     Convenience function to detect fraud in an image.
     
     Args:
         image_path: Path to the image file
+        use_cache: Allow a cached result for identical image bytes
         
     Returns:
         Fraud detection results dictionary
     """
     detector = get_fraud_detector()
-    return detector.detect(image_path)
+    return detector.detect(image_path, use_cache=use_cache)
@@ -3,10 +3,17 @@ Gemini API integration for text extraction and fraud detection
 """
 import google.generativeai as genai
 from django.conf import settings
+from django.core.cache import cache
+import hashlib
 import json
 import re
+import threading
 import gc  # Garbage collection for memory optimization
-from .verhoeff import validate_aadhaar
+from .verhoeff import validate_aadhaar, clean_aadhaar_number
+
+
+# Aadhaar number format: 12 digits, first digit 2-9 (compiled once at import)
+AADHAAR_FORMAT_RE = re.compile(r'^[2-9][0-9]{11}$')
 
 
 def normalize_bilingual_field(value):
@@ -52,6 +59,10 @@ class GeminiService:
     _instance = None
     _lock = None  # Threading lock for sequential processing
     
+    # Cache analyses by image content hash so re-submitted images skip the API
+    CACHE_PREFIX = "gemini_analysis"
+    CACHE_TIMEOUT = 60 * 60  # 1 hour
+    
     def __new__(cls):
         """Singleton pattern - reuse the same instance"""
         if cls._instance is None:
@@ -64,18 +75,19 @@ class GeminiService:
         if self._initialized:
             return
             
-        import threading
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model = genai.GenerativeModel("gemini-2.5-flash")
         GeminiService._lock = threading.Lock()
         self._initialized = True
     
-    def extract_text_from_image(self, image_path):
+    def extract_text_from_image(self, image_path, use_cache=True):
         """
         Extract text and analyze Aadhaar document
         
         Args:
             image_path: Path to the image file
+            use_cache: Return a recent cached analysis of identical image bytes.
+                Pass False to force a fresh Gemini verdict (re-analysis).
             
         Returns:
             dict: Extracted information including text, fields, and fraud indicators
@@ -87,15 +99,23 @@ class GeminiService:
         # Acquire lock to ensure only one document is processed at a time
         # This prevents OOM errors on low-memory servers (0.5GB RAM)
         with GeminiService._lock:
-            return self._process_image(image_path)
+            return self._process_image(image_path, use_cache)
     
-    def _process_image(self, image_path):
+    def _process_image(self, image_path, use_cache=True):
         """Internal method that does the actual image processing"""
         try:
             # Read the image file
             with open(image_path, "rb") as f:
                 img_bytes = f.read()
             
+            # Return the cached analysis if this exact image was analyzed recently
+            cache_key = f"{self.CACHE_PREFIX}:{hashlib.sha256(img_bytes).hexdigest()}"
+            cached_response = cache.get(cache_key) if use_cache else None
+            if cached_response is not None:
+                del img_bytes
+                gc.collect()
+                return cached_response
+            
             # Create detailed prompt for Aadhaar analysis - supports both card and e-Aadhaar formats
             prompt = """You are an expert Aadhaar fraud detection system. Analyze this document carefully.
 
@@ -202,22 +222,26 @@ Respond ONLY with JSON, no additional text."""
             response_text = response.text.strip()
             
             # Try to extract JSON from the response
-            # Sometimes the model includes markdown code blocks
-            if "```json" in response_text:
-                # Extract JSON from markdown code block
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.rfind("```")
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                # Extract from generic code block
-                json_start = response_text.find("```") + 3
+            # Sometimes the model includes markdown code blocks. Locate the
+            # first fence once; a "```json" fence can only start at or after it.
+            fence_start = response_text.find("```")
+            if fence_start != -1:
+                json_fence = response_text.find("```json", fence_start)
+                if json_fence != -1:
+                    # Extract JSON from markdown code block
+                    json_start = json_fence + 7
+                else:
+                    # Extract from generic code block
+                    json_start = fence_start + 3
                 json_end = response_text.rfind("```")
                 response_text = response_text[json_start:json_end].strip()
             
             # Parse JSON response
+            parsed_ok = True
             try:
                 parsed_response = json.loads(response_text)
             except json.JSONDecodeError:
+                parsed_ok = False
                 # If JSON parsing fails, create a structured response
                 parsed_response = {
                     "full_text": response_text,
@@ -254,7 +278,7 @@ Respond ONLY with JSON, no additional text."""
             
             if aadhaar_num:
                 # Clean the number first (remove spaces/hyphens)
-                clean_num = str(aadhaar_num).replace(" ", "").replace("-", "")
+                clean_num = clean_aadhaar_number(aadhaar_num)
                 
                 # Step 1: Check Length
                 if len(clean_num) != 12:
@@ -265,7 +289,7 @@ Respond ONLY with JSON, no additional text."""
                     validation_error = f"Invalid first digit: {clean_num[0]} (must be 2-9)"
                 
                 # Step 3: Check Number Format (Regex)
-                elif not re.match(r'^[2-9][0-9]{11}$', clean_num):
+                elif not AADHAAR_FORMAT_RE.match(clean_num):
                     validation_error = "Invalid Aadhaar number format (Regex mismatch)"
                 
                 # Step 4: Apply Verhoeff Checksum
@@ -293,6 +317,10 @@ Respond ONLY with JSON, no additional text."""
             # Add the raw response for reference
             parsed_response['raw_gemini_response'] = response.text
             
+            # Only cache structured responses so unparseable ones are retried
+            if parsed_ok:
+                cache.set(cache_key, parsed_response, self.CACHE_TIMEOUT)
+            
             # Free memory explicitly (important for low-RAM servers like Render free tier)
             del img_bytes
             gc.collect()
@@ -5,6 +5,7 @@ Supports both local storage and Supabase Storage
 Use environment variable USE_SUPABASE_STORAGE=true to enable Supabase Storage
 """
 import os
+import re
 import logging
 from io import BytesIO
 from datetime import datetime
@@ -12,6 +13,9 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Characters not allowed in storage filenames (compiled once at import)
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^A-Za-z0-9._-]')
+
 
 class StorageService:
     """
@@ -40,7 +44,7 @@ class StorageService:
             self.supabase_storage = SupabaseStorage
             logger.info("Supabase Storage initialized successfully")
         except ImportError as e:
-            logger.warning(f"Failed to import Supabase client: {e}. Falling back to local storage.")
+            logger.warning("Failed to import Supabase client: %s. Falling back to local storage.", e)
             self.use_supabase = False
             self.supabase_storage = None
     
@@ -63,9 +67,8 @@ class StorageService:
     
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize filename to be safe for storage"""
-        # Remove potentially dangerous characters
-        safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-')
-        sanitized = ''.join(c if c in safe_chars else '_' for c in filename)
+        # Replace potentially dangerous characters
+        sanitized = UNSAFE_FILENAME_CHARS_RE.sub('_', filename)
         return sanitized[:100]  # Limit filename length
     
     def upload_file(self, file_data, user_id: int, document_id: int, filename: str, 
@@ -111,7 +114,7 @@ class StorageService:
                 'storage_type': 'supabase'
             }
         except Exception as e:
-            logger.error(f"Supabase upload error: {e}")
+            logger.error("Supabase upload error: %s", e)
             # Fallback to local storage
             return self._upload_to_local(storage_path, file_bytes)
     
@@ -181,7 +184,7 @@ class StorageService:
             try:
                 return self.supabase_storage.download_file(storage_path)
             except Exception as e:
-                logger.error(f"Supabase download error: {e}")
+                logger.error("Supabase download error: %s", e)
                 # Fallback to local
                 return self._download_from_local(storage_path)
         else:
@@ -208,7 +211,7 @@ class StorageService:
                 self.supabase_storage.delete_file(storage_path)
                 return True
             except Exception as e:
-                logger.error(f"Supabase delete error: {e}")
+                logger.error("Supabase delete error: %s", e)
                 return self._delete_from_local(storage_path)
         else:
             return self._delete_from_local(storage_path)
@@ -221,7 +224,7 @@ class StorageService:
                 os.remove(local_path)
             return True
         except Exception as e:
-            logger.error(f"Local delete error: {e}")
+            logger.error("Local delete error: %s", e)
             return False
     
     def file_exists(self, storage_path: str) -> bool:
@@ -67,3 +67,104 @@ class ConvertToJsonSerializableTests(TestCase):
         
         result = convert_to_json_serializable(None)
         self.assertIsNone(result)
+
+
+class BlockSplitTests(TestCase):
+    """Tests for the vectorized block helper used by CV analysis"""
+    
+    def test_split_into_blocks_matches_loop_grid(self):
+        """TC066: Test block view covers the same blocks as the stepped loop"""
+        import numpy as np
+        from documents.fraud_detector import _split_into_blocks
+        
+        arr = np.arange(70 * 130).reshape(70, 130)
+        blocks = _split_into_blocks(arr, 32)
+        
+        expected = [
+            arr[i:i+32, j:j+32]
+            for i in range(0, 70 - 32, 32)
+            for j in range(0, 130 - 32, 32)
+        ]
+        self.assertEqual(blocks.shape, (2, 4, 32, 32))
+        for block, exp in zip(blocks.reshape(-1, 32, 32), expected):
+            self.assertTrue(np.array_equal(block, exp))
+
+
+class SplitCvIndicatorsTests(TestCase):
+    """Tests for partitioning fraud indicators"""
+    
+    def test_split_cv_indicators(self):
+        """TC068: Test CV heuristic indicators are separated from critical ones"""
+        from documents.fraud_detector import split_cv_indicators
+        
+        critical, cv = split_cv_indicators([
+            'Suspicious compression artifacts detected (score: 250.00)',
+            'Photo appears to be tampered or overlaid (90.0% confidence)',
+            'Suspicious edge patterns detected',
+        ])
+        self.assertEqual(critical, ['Photo appears to be tampered or overlaid (90.0% confidence)'])
+        self.assertEqual(len(cv), 2)
+
+
+class DetectResultCacheTests(TestCase):
+    """Tests for the content-hash cache of detection results"""
+    
+    def setUp(self):
+        """Start each test with an empty cache and a scratch directory"""
+        import tempfile
+        from django.core.cache import cache
+        from documents.fraud_detector import FraudDetector
+        
+        cache.clear()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.detector = FraudDetector()
+        self.detector._model_searched = True
+    
+    def tearDown(self):
+        """Clean up the cache and scratch files"""
+        from django.core.cache import cache
+        
+        cache.clear()
+        self.tmp_dir.cleanup()
+    
+    def _write_image(self, name):
+        import os
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(b'same image bytes')
+        return path
+    
+    def test_duplicate_image_reuses_cached_result(self):
+        """TC071: Test identical image bytes skip re-analysis and return a copy"""
+        cv_result = {'fraud_indicators': [], 'details': {'blur_score': 1.0}, 'error': False}
+        paths = [self._write_image('front.jpg'), self._write_image('resubmitted.jpg')]
+        
+        with patch.object(self.detector, '_run_cv_analysis', return_value=cv_result) as mock_cv, \
+             patch('documents.fraud_detector.CV2_AVAILABLE', True), \
+             patch.object(self.detector, '_decode_image', return_value=None):
+            first = self.detector.detect(paths[0])
+            first['fraud_indicators'].append('mutated by caller')
+            second = self.detector.detect(paths[1])
+        
+        self.assertEqual(mock_cv.call_count, 1)
+        self.assertEqual(second['fraud_indicators'], [])
+        self.assertEqual(second['analysis_details'], {'blur_score': 1.0})
+    
+    def test_use_cache_false_and_failed_runs_rerun_analysis(self):
+        """TC076: Test cache bypass re-runs analysis and failed runs are not cached"""
+        ok_result = {'fraud_indicators': [], 'details': {}, 'error': False}
+        failed_result = {'fraud_indicators': ['Analysis error: boom'], 'details': {}, 'error': True}
+        path = self._write_image('doc.jpg')
+        
+        with patch('documents.fraud_detector.CV2_AVAILABLE', True), \
+             patch.object(self.detector, '_decode_image', return_value=None):
+            with patch.object(self.detector, '_run_cv_analysis', return_value=failed_result) as mock_cv:
+                self.detector.detect(path)
+                self.detector.detect(path)
+            self.assertEqual(mock_cv.call_count, 2)
+            
+            with patch.object(self.detector, '_run_cv_analysis', return_value=ok_result) as mock_cv:
+                self.detector.detect(path)
+                self.detector.detect(path, use_cache=False)
+                self.detector.detect(path)
+            self.assertEqual(mock_cv.call_count, 2)
@@ -80,6 +80,20 @@ class ImageResizeTests(TestCase):
             self.assertLessEqual(height, ImagePreprocessor.MAX_HEIGHT)
         finally:
             os.remove(large_path)
+    
+    def test_quality_metrics_use_uploaded_resolution(self):
+        """TC067: Test quality checks measure the full-resolution upload before resizing"""
+        large_image = Image.new('RGB', (4000, 3000), color='white')
+        large_path = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False).name
+        large_image.save(large_path)
+        
+        try:
+            # Quality metrics report the uploaded resolution
+            result = ImagePreprocessor(large_path).process_all()
+            self.assertEqual(result['quality_report']['metrics']['width'], 4000)
+            self.assertEqual(result['processed_image'].size, (960, 720))
+        finally:
+            os.remove(large_path)
 
 
 class ThumbnailCreationTests(TestCase):
@@ -151,6 +165,21 @@ class QualityCheckTests(TestCase):
         score = quality_report['quality_score']
         self.assertGreaterEqual(score, 0.0)
         self.assertLessEqual(score, 1.0)
+    
+    def test_equal_brightness_colour_edges_are_not_blurry(self):
+        """TC079: Test colour edges of equal brightness still count as sharp"""
+        stripes = Image.new('RGB', (400, 400), color=(255, 0, 0))
+        for x in range(0, 400, 8):
+            stripes.paste((0, 130, 0), (x, 0, x + 4, 400))
+        stripe_path = tempfile.NamedTemporaryFile(suffix='.png', delete=False).name
+        stripes.save(stripe_path)
+        
+        try:
+            quality_report = ImagePreprocessor(stripe_path).check_quality()
+            self.assertGreater(quality_report['metrics']['edge_strength'], 10)
+            self.assertNotIn("Image appears blurry", quality_report['issues'])
+        finally:
+            os.remove(stripe_path)
 
 
 class ProcessAllTests(TestCase):
@@ -3,7 +3,7 @@ Tests for Verhoeff Algorithm - Aadhaar Number Validation
 """
 import re
 from django.test import TestCase
-from documents.verhoeff import validate_aadhaar, VerhoeffValidator
+from documents.verhoeff import validate_aadhaar, clean_aadhaar_number, VerhoeffValidator
 
 
 class VerhoeffValidatorTests(TestCase):
@@ -49,6 +49,26 @@ class VerhoeffValidatorTests(TestCase):
         """TC010: Test that Aadhaar with special chars (except space/hyphen) fails"""
         self.assertFalse(validate_aadhaar("1234.1234.1234"))
         self.assertFalse(validate_aadhaar("1234/1234/1234"))
+    
+    def test_clean_aadhaar_number(self):
+        """TC070: Test separators are stripped and other characters are kept"""
+        self.assertEqual(clean_aadhaar_number("1234 1234-1234"), "123412341234")
+        self.assertEqual(clean_aadhaar_number("123412341234"), "123412341234")
+        self.assertEqual(clean_aadhaar_number(123412341234), "123412341234")
+        self.assertEqual(clean_aadhaar_number("1234.1234"), "1234.1234")
+    
+    def test_composed_table_matches_d_and_p(self):
+        """TC072: Test the composed lookup table equals d[c][p[i][n]]"""
+        V = VerhoeffValidator
+        for i in range(8):
+            for c in range(10):
+                for n in range(10):
+                    self.assertEqual(V.dp[i][c][n], V.d[c][V.p[i][n]])
+    
+    def test_non_ascii_digits_fail(self):
+        """TC075: Test that Unicode digit characters fail instead of raising"""
+        self.assertFalse(validate_aadhaar("12341234123\u00b2"))
+        self.assertFalse(validate_aadhaar("\u0661" * 12))
 
 
 class AadhaarFormatRegexTests(TestCase):
@@ -3,6 +3,20 @@ Verhoeff algorithm implementation for Aadhaar number validation.
 The Verhoeff algorithm is a checksum formula for error detection.
 """
 
+
+def _compose_tables(d, p):
+    """
+    Fold the permutation step into the multiplication table.
+    
+    Returns a table indexed as [position % 8][checksum][digit] so each digit
+    costs a single lookup: dp[i][c][n] == d[c][p[i][n]].
+    """
+    return [
+        [[d[c][p_row[n]] for n in range(10)] for c in range(10)]
+        for p_row in p
+    ]
+
+
 class VerhoeffValidator:
     """
     Helper class to validate numbers using the Verhoeff algorithm.
@@ -38,6 +52,27 @@ class VerhoeffValidator:
     # Inverse table (inv)
     inv = [0, 4, 3, 2, 1, 5, 6, 7, 8, 9]
 
+    # Composed table (dp): d and p combined, built once at import
+    dp = _compose_tables(d, p)
+
+    # Translation table that deletes the separators allowed in Aadhaar numbers
+    SEPARATORS = str.maketrans('', '', ' -')
+
+    @classmethod
+    def clean(cls, number) -> str:
+        """
+        Remove the spaces and hyphens allowed as separators in an Aadhaar number.
+        
+        Args:
+            number: The Aadhaar number, possibly formatted as XXXX XXXX XXXX
+            
+        Returns:
+            str: The number with separators removed
+        """
+        number = str(number)
+        # Skip the translate pass for the common already-clean case
+        return number if number.isdigit() else number.translate(cls.SEPARATORS)
+
     @classmethod
     def validate(cls, number: str) -> bool:
         """
@@ -53,9 +88,10 @@ class VerhoeffValidator:
             return False
             
         # Remove spaces and hyphens
-        clean_number = number.replace(" ", "").replace("-", "")
+        clean_number = cls.clean(number)
         
-        if not clean_number.isdigit():
+        # ASCII only: str.isdigit() also accepts characters such as '²'
+        if not (clean_number.isascii() and clean_number.isdigit()):
             return False
             
         # Aadhaar numbers are 12 digits
@@ -63,10 +99,12 @@ class VerhoeffValidator:
             return False
         
         c = 0
-        reversed_number = reversed(clean_number)
+        dp = cls.dp
+        # Iterating the ASCII bytes yields ints, so each digit is just byte - 48
+        reversed_number = reversed(clean_number.encode('ascii'))
         
         for i, item in enumerate(reversed_number):
-            c = cls.d[c][cls.p[i % 8][int(item)]]
+            c = dp[i % 8][c][item - 48]
             
         return c == 0
 
@@ -75,3 +113,10 @@ def validate_aadhaar(number: str) -> bool:
     Convenience function to validate an Aadhaar number.
     """
     return VerhoeffValidator.validate(number)
+
+
+def clean_aadhaar_number(number) -> str:
+    """
+    Convenience function to strip separators from an Aadhaar number.
+    """
+    return VerhoeffValidator.clean(number)
@@ -12,8 +12,10 @@ from django.utils import timezone
 from django.db import transaction
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import uuid
 import os
+import tempfile
 
 from .models import AadhaarDocument, DocumentMetadata
 from .serializers import (
@@ -25,9 +27,40 @@ from .serializers import (
 from .preprocessing import ImagePreprocessor
 from .gemini_service import GeminiService
 from .storage_service import get_storage_service
+from .verhoeff import clean_aadhaar_number
 
 logger = logging.getLogger(__name__)
 
+# Single background worker for YOLO/CV fraud detection: it overlaps with the
+# (network-bound) Gemini request while still running one detection at a time.
+# Every detect_fraud call from the views goes through it.
+_fraud_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fraud-detect')
+
+# Seconds a request waits for a fraud detection result before giving up
+FRAUD_DETECTION_TIMEOUT = 120
+
+
+def _run_fraud_detection(image_path, use_cache=True):
+    """Run detect_fraud on the shared worker and wait for it with a timeout."""
+    from .fraud_detector import detect_fraud
+    
+    future = _fraud_executor.submit(detect_fraud, image_path, use_cache)
+    try:
+        return future.result(timeout=FRAUD_DETECTION_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Fraud detection timed out after {FRAUD_DETECTION_TIMEOUT}s")
+
+
+def _remove_temp_file(temp_file_path):
+    """Delete a temporary download, logging rather than raising on failure."""
+    if os.path.exists(temp_file_path):
+        try:
+            os.remove(temp_file_path)
+            logger.info("Cleaned up temp file: %s", temp_file_path)
+        except Exception as e:
+            logger.warning("Failed to cleanup temp file: %s", e)
+
 
 class AadhaarDocumentViewSet(viewsets.ModelViewSet):
     """
@@ -162,15 +195,14 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                         )
                         document.supabase_processed_path = processed_result['path']
                         
-                        # Create thumbnail and upload to Supabase
-                        thumb_preprocessor = ImagePreprocessor(BytesIO(file_bytes))
-                        thumb = thumb_preprocessor.create_thumbnail()
+                        # Upload the thumbnail process_all() already created
+                        thumb = preprocess_result['thumbnail']
                         thumb_bytes_io = BytesIO()
                         thumb.save(thumb_bytes_io, format='JPEG', quality=85)
                         thumb_bytes_io.seek(0)  # Reset pointer to beginning
                         thumb_bytes = thumb_bytes_io.getvalue()
                         
-                        logger.info(f"Thumbnail size: {len(thumb_bytes)} bytes for document {document.id}")
+                        logger.info("Thumbnail size: %s bytes for document %s", len(thumb_bytes), document.id)
                         
                         thumb_filename = f"thumb_{document.id}_{file.name}"
                         thumb_result = storage_service.upload_file(
@@ -182,9 +214,9 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                             content_type='image/jpeg'
                         )
                         document.supabase_thumbnail_path = thumb_result['path']
-                        logger.info(f"Thumbnail uploaded to: {thumb_result['path']}")
+                        logger.info("Thumbnail uploaded to: %s", thumb_result['path'])
                         
-                        logger.info(f"Uploaded document {document.id} to Supabase: {original_result['path']}")
+                        logger.info("Uploaded document %s to Supabase: %s", document.id, original_result['path'])
                         
                     else:
                         # === LOCAL STORAGE MODE ===
@@ -210,16 +242,15 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                         preprocessor.save_to_file(preprocessed_path)
                         document.preprocessed_file = f"processed/{preprocessed_filename}"
                         
-                        # Save thumbnail locally
-                        thumb_preprocessor = ImagePreprocessor(document.original_file.path)
-                        thumb = thumb_preprocessor.create_thumbnail()
+                        # Save the thumbnail process_all() already created
+                        thumb = preprocess_result['thumbnail']
                         thumb_filename = f"thumb_{document.id}_{file.name}"
                         thumb_path = os.path.join('media', 'thumbnails', thumb_filename)
                         os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
                         thumb.save(thumb_path, quality=85)
                         document.thumbnail = f"thumbnails/{thumb_filename}"
                         
-                        logger.info(f"Stored document {document.id} locally")
+                        logger.info("Stored document %s locally", document.id)
                     
                     document.status = 'processing'
                     document.save()
@@ -242,7 +273,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                     
             except Exception as e:
                 # Log the error and continue with next file
-                logger.error(f"Failed to process {file.name}: {str(e)}")
+                logger.error("Failed to process %s: %s", file.name, e)
                 failed_files.append({'file_name': file.name, 'error': str(e)})
                 
                 # Try to mark document as failed if it was created (outside the failed transaction)
@@ -290,7 +321,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
         import traceback
         
         document = self.get_object()
-        logger.info(f"Analyze request for document {document.id}, storage_type={document.storage_type}")
+        logger.info("Analyze request for document %s, storage_type=%s", document.id, document.storage_type)
         
         if document.status == 'processing':
             return Response(
@@ -305,8 +336,8 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             # Get or create metadata
             metadata, created = DocumentMetadata.objects.get_or_create(document=document)
             
-            # Run Gemini analysis
-            self._analyze_document(document, metadata)
+            # Run Gemini analysis (explicit re-analysis skips cached results)
+            self._analyze_document(document, metadata, use_cache=False)
             
             document.status = 'completed'
             document.processed_at = timezone.now()
@@ -317,7 +348,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             
         except Exception as e:
             # Log full traceback for debugging
-            logger.error(f"Analyze failed for document {document.id}: {str(e)}")
+            logger.error("Analyze failed for document %s: %s", document.id, e)
             logger.error(traceback.format_exc())
             print(f"ERROR: {str(e)}")
             print(traceback.format_exc())
@@ -452,7 +483,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                         storage_service.delete_file(document.supabase_processed_path)
                     if document.supabase_thumbnail_path:
                         storage_service.delete_file(document.supabase_thumbnail_path)
-                    logger.info(f"Deleted document {document.id} from Supabase Storage")
+                    logger.info("Deleted document %s from Supabase Storage", document.id)
                 else:
                     # Delete from local storage via Django ImageField
                     if document.original_file:
@@ -461,7 +492,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                         document.preprocessed_file.delete(save=False)
                     if document.thumbnail:
                         document.thumbnail.delete(save=False)
-                    logger.info(f"Deleted document {document.id} from local storage")
+                    logger.info("Deleted document %s from local storage", document.id)
                 
                 # Delete the document record
                 document.delete()
@@ -554,11 +585,12 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
         )
         
         # Calculate statistics based on is_authentic field
-        stats = {
-            'total': completed_docs.count(),
-            'accepted': completed_docs.filter(metadata__is_authentic=True).count(),
-            'rejected': completed_docs.filter(metadata__is_authentic=False).count(),
-        }
+        # Single aggregate query instead of one COUNT per statistic
+        stats = completed_docs.aggregate(
+            total=Count('id'),
+            accepted=Count('id', filter=Q(metadata__is_authentic=True)),
+            rejected=Count('id', filter=Q(metadata__is_authentic=False)),
+        )
         
         # Serialize documents
         serializer = self.get_serializer(completed_docs, many=True, context={'request': request})
@@ -566,7 +598,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
         return Response({
             'stats': stats,
             'documents': serializer.data,
-            'count': completed_docs.count()
+            'count': stats['total']
         })
     
     @action(detail=False, methods=['get'])
@@ -737,7 +769,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
         - Structured data file with extracted information
         """
         from django.db.models import Q
-        from django.http import HttpResponse, JsonResponse
+        from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
         from openpyxl import Workbook
         from openpyxl.styles import Font, PatternFill, Alignment
         from io import BytesIO
@@ -770,32 +802,32 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 .order_by('-uploaded_at')
             )
         
-        # Prepare extracted data
-        extracted_data = []
-        for doc in documents:
-            metadata = doc.metadata
-            extracted_data.append({
-                'document_id': doc.id,
-                'file_name': doc.file_name,
-                'upload_date': doc.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
-                'aadhaar_number': metadata.aadhaar_number or '',
-                'name': metadata.name or '',
-                'date_of_birth': metadata.date_of_birth or '',
-                'gender': metadata.gender or '',
-                'address': metadata.address or '',
-                'confidence_score': f"{metadata.confidence_score*100:.1f}%" if metadata.confidence_score else '0%',
-                'is_authentic': 'Yes' if metadata.is_authentic else 'No',
-                'fraud_indicators': '; '.join(metadata.fraud_indicators) if metadata.fraud_indicators else '',
-                'quality_issues': '; '.join(metadata.quality_issues) if metadata.quality_issues else '',
-                'analyzed_at': metadata.analyzed_at.strftime("%Y-%m-%d %H:%M:%S") if metadata.analyzed_at else ''
-            })
+        def iter_extracted_data():
+            """Yield one export record per document without caching the queryset."""
+            for doc in documents.iterator(chunk_size=500):
+                metadata = doc.metadata
+                yield {
+                    'document_id': doc.id,
+                    'file_name': doc.file_name,
+                    'upload_date': doc.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    'aadhaar_number': metadata.aadhaar_number or '',
+                    'name': metadata.name or '',
+                    'date_of_birth': metadata.date_of_birth or '',
+                    'gender': metadata.gender or '',
+                    'address': metadata.address or '',
+                    'confidence_score': f"{metadata.confidence_score*100:.1f}%" if metadata.confidence_score else '0%',
+                    'is_authentic': 'Yes' if metadata.is_authentic else 'No',
+                    'fraud_indicators': '; '.join(metadata.fraud_indicators) if metadata.fraud_indicators else '',
+                    'quality_issues': '; '.join(metadata.quality_issues) if metadata.quality_issues else '',
+                    'analyzed_at': metadata.analyzed_at.strftime("%Y-%m-%d %H:%M:%S") if metadata.analyzed_at else ''
+                }
         
         # Generate filename with timestamp
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if export_format == 'json':
             filename = f"extracted_data_{timestamp}.json"
-            response = JsonResponse(extracted_data, safe=False)
+            response = JsonResponse(list(iter_extracted_data()), safe=False)
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
             
@@ -822,7 +854,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 cell.alignment = header_alignment
             
             # Add data rows
-            for row, data in enumerate(extracted_data, 2):
+            for row, data in enumerate(iter_extracted_data(), 2):
                 ws.cell(row=row, column=1, value=data['document_id'])
                 ws.cell(row=row, column=2, value=data['file_name'])
                 ws.cell(row=row, column=3, value=data['upload_date'])
@@ -865,33 +897,40 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             
         else:  # CSV format (default)
             filename = f"extracted_data_{timestamp}.csv"
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
             
-            writer = csv.writer(response)
-            # Write headers
-            writer.writerow(['Document ID', 'File Name', 'Upload Date', 'Aadhaar Number', 'Name', 
-                           'Date of Birth', 'Gender', 'Address', 'Confidence Score', 'Is Authentic', 
-                           'Fraud Indicators', 'Quality Issues', 'Analyzed At'])
+            class Echo:
+                """Pseudo-buffer that hands each formatted CSV line back to the caller."""
+                def write(self, value):
+                    return value
             
-            # Write data rows
-            for data in extracted_data:
-                writer.writerow([
-                    data['document_id'],
-                    data['file_name'],
-                    data['upload_date'],
-                    data['aadhaar_number'],
-                    data['name'],
-                    data['date_of_birth'],
-                    data['gender'],
-                    data['address'],
-                    data['confidence_score'],
-                    data['is_authentic'],
-                    data['fraud_indicators'],
-                    data['quality_issues'],
-                    data['analyzed_at']
-                ])
+            writer = csv.writer(Echo())
             
+            def iter_csv_rows():
+                # Write headers
+                yield writer.writerow(['Document ID', 'File Name', 'Upload Date', 'Aadhaar Number', 'Name', 
+                                     'Date of Birth', 'Gender', 'Address', 'Confidence Score', 'Is Authentic', 
+                                     'Fraud Indicators', 'Quality Issues', 'Analyzed At'])
+                
+                # Write data rows as they are read from the database
+                for data in iter_extracted_data():
+                    yield writer.writerow([
+                        data['document_id'],
+                        data['file_name'],
+                        data['upload_date'],
+                        data['aadhaar_number'],
+                        data['name'],
+                        data['date_of_birth'],
+                        data['gender'],
+                        data['address'],
+                        data['confidence_score'],
+                        data['is_authentic'],
+                        data['fraud_indicators'],
+                        data['quality_issues'],
+                        data['analyzed_at']
+                    ])
+            
+            response = StreamingHttpResponse(iter_csv_rows(), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
     
     @action(detail=False, methods=['get'])
@@ -906,7 +945,6 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
         Returns:
         - Detailed fraud detection results with YOLO detections and CV analysis
         """
-        from .fraud_detector import detect_fraud
         import json
         
         document_id = request.query_params.get('document_id')
@@ -932,9 +970,9 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                     'status': 'completed'
                 })
             
-            # Run fraud detection
+            # Run fraud detection on the shared worker (one detection at a time)
             image_path = document.preprocessed_file.path if document.preprocessed_file else document.original_file.path
-            fraud_result = detect_fraud(image_path)
+            fraud_result = _run_fraud_detection(image_path, use_cache=not reanalyze)
             
             # Store results
             metadata.fraud_detection = {
@@ -959,6 +997,12 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 {'error': 'Document not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        except TimeoutError as e:
+            logger.warning("Fraud analysis for document %s: %s", document_id, e)
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_504_GATEWAY_TIMEOUT
+            )
         except Exception as e:
             import traceback
             print(f"Fraud analysis error: {traceback.format_exc()}")
@@ -967,20 +1011,18 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _analyze_document(self, document, metadata):
+    def _analyze_document(self, document, metadata, use_cache=True):
         """
         Internal method to analyze a document with Gemini and YOLO fraud detection
         
         Args:
             document: AadhaarDocument instance
             metadata: DocumentMetadata instance
+            use_cache: Allow cached Gemini and fraud detection results; False forces a fresh run
         """
-        import tempfile
-        import os
-        
-        logger.info(f"Starting analysis for document {document.id}, storage_type={document.storage_type}")
-        logger.info(f"Document paths: original_file={document.original_file}, preprocessed_file={document.preprocessed_file}")
-        logger.info(f"Supabase paths: original={document.supabase_original_path}, processed={document.supabase_processed_path}")
+        logger.info("Starting analysis for document %s, storage_type=%s", document.id, document.storage_type)
+        logger.info("Document paths: original_file=%s, preprocessed_file=%s", document.original_file, document.preprocessed_file)
+        logger.info("Supabase paths: original=%s, processed=%s", document.supabase_original_path, document.supabase_processed_path)
         
         gemini_service = GeminiService()
         storage_service = get_storage_service()
@@ -992,7 +1034,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             (document.original_file and hasattr(document.original_file, 'path') and document.original_file.path)
         )
         
-        logger.info(f"Auto-detect: has_supabase_paths={has_supabase_paths}, has_local_paths={has_local_paths}")
+        logger.info("Auto-detect: has_supabase_paths=%s, has_local_paths=%s", has_supabase_paths, has_local_paths)
         
         # Get image path - prefer Supabase if available, then try local
         if has_supabase_paths:
@@ -1001,7 +1043,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 # Prefer processed file, fallback to original
                 supabase_path = document.supabase_processed_path or document.supabase_original_path
                 
-                logger.info(f"Downloading from Supabase: {supabase_path}")
+                logger.info("Downloading from Supabase: %s", supabase_path)
                 
                 # Download file bytes from Supabase
                 file_bytes = storage_service.download_file(supabase_path)
@@ -1012,10 +1054,10 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                     tmp_file.write(file_bytes)
                     image_path = tmp_file.name
                     
-                logger.info(f"Downloaded Supabase file to temp: {image_path}")
+                logger.info("Downloaded Supabase file to temp: %s", image_path)
                 
             except Exception as e:
-                logger.error(f"Failed to download from Supabase: {e}")
+                logger.error("Failed to download from Supabase: %s", e)
                 raise ValueError(f"Cannot access document from Supabase: {e}")
         else:
             # Use local file path
@@ -1028,10 +1070,24 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
         
         # Track if we need to cleanup temp file (only if downloaded from Supabase)
         temp_file_path = image_path if has_supabase_paths else None
+        fraud_future = None
         
         try:
+            # Start YOLO fraud detection in the background; it only needs the
+            # image, so it runs while we wait on the Gemini response.
+            # Detection is optional: any import/submit failure (not just
+            # ImportError from torch/ultralytics) must not fail the analysis.
+            fraud_start_error = None
+            try:
+                from .fraud_detector import detect_fraud, split_cv_indicators
+                fraud_future = _fraud_executor.submit(detect_fraud, image_path, use_cache)
+            except Exception as e:
+                logger.warning("Could not start fraud detection for document %s: %s", document.id, e)
+                fraud_future = None
+                fraud_start_error = e
+            
             # Get analysis from Gemini
-            analysis = gemini_service.extract_text_from_image(image_path)
+            analysis = gemini_service.extract_text_from_image(image_path, use_cache=use_cache)
             
             # Update metadata with analysis results
             metadata.full_text = analysis.get('full_text', '')
@@ -1039,7 +1095,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             # Clean Aadhaar number - remove spaces and hyphens to fit in 12-char field
             aadhaar_num = analysis.get('aadhaar_number', '')
             if aadhaar_num:
-                aadhaar_num = str(aadhaar_num).replace(' ', '').replace('-', '')[:12]
+                aadhaar_num = clean_aadhaar_number(aadhaar_num)[:12]
             metadata.aadhaar_number = aadhaar_num if aadhaar_num else None
             metadata.name = analysis.get('name')
             metadata.date_of_birth = analysis.get('date_of_birth')
@@ -1093,10 +1149,14 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             extracted_fields['design_compliance'] = design_compliance
             metadata.extracted_fields = extracted_fields
             
-            # Run YOLO fraud detection (async/optional to avoid slowing down main analysis)
+            # Collect YOLO fraud detection (optional, ran concurrently with Gemini)
             try:
-                from .fraud_detector import detect_fraud
-                fraud_result = detect_fraud(image_path)
+                if fraud_future is None:
+                    raise RuntimeError(f"Fraud detection unavailable: {fraud_start_error}")
+                try:
+                    fraud_result = fraud_future.result(timeout=FRAUD_DETECTION_TIMEOUT)
+                except FutureTimeoutError:
+                    raise TimeoutError(f"Fraud detection timed out after {FRAUD_DETECTION_TIMEOUT}s")
                 
                 # Store fraud detection results
                 metadata.fraud_detection = {
@@ -1109,18 +1169,10 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 
                 # Merge fraud indicators from YOLO detection
                 # But filter out CV-based false positives (compression, noise, edge artifacts)
-                cv_false_positive_keywords = ['compression', 'noise', 'copy-paste', 'edge']
                 yolo_indicators = fraud_result.get('fraud_indicators', [])
                 
                 # Separate critical indicators from CV-based indicators
-                critical_indicators = [
-                    ind for ind in yolo_indicators
-                    if not any(kw in ind.lower() for kw in cv_false_positive_keywords)
-                ]
-                cv_indicators = [
-                    ind for ind in yolo_indicators
-                    if any(kw in ind.lower() for kw in cv_false_positive_keywords)
-                ]
+                critical_indicators, cv_indicators = split_cv_indicators(yolo_indicators)
                 
                 if yolo_indicators:
                     all_fraud_indicators = metadata.fraud_indicators or []
@@ -1157,7 +1209,7 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
                 
             except Exception as e:
                 # Log error but don't fail the entire analysis
-                logger.warning(f"Fraud detection failed for document {document.id}: {e}")
+                logger.warning("Fraud detection failed for document %s: %s", document.id, e)
                 metadata.fraud_detection = {
                     'error': str(e),
                     'risk_score': 0.0,
@@ -1167,10 +1219,15 @@ class AadhaarDocumentViewSet(viewsets.ModelViewSet):
             metadata.save()
             
         finally:
-            # Cleanup temp file if we created one
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.remove(temp_file_path)
-                    logger.info(f"Cleaned up temp file: {temp_file_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup temp file: {e}")
+            # Drop detection if it never started; a running (possibly hung)
+            # detection is not waited on here
+            if fraud_future is not None:
+                fraud_future.cancel()
+            
+            # Cleanup temp file if we created one, but only once background
+            # detection is done with it (runs immediately if already finished)
+            if temp_file_path:
+                if fraud_future is None:
+                    _remove_temp_file(temp_file_path)
+                else:
+                    fraud_future.add_done_callback(lambda _: _remove_temp_file(temp_file_path))